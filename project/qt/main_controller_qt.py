@@ -8,10 +8,10 @@ Created on 2023-06-11.
 """
 
 from main_view_qt import CafeWindow, FinaliseOrderWindow
-from main_model import Menu, MenuCategory, Order
-from main_utils import get_valid_bool, get_valid_input, get_valid_int
+from main_model import Menu, MenuCategory, MenuItem, Order
 from main_utils import format_price
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+from PySide6.QtCore import Slot
 from PySide6.QtWidgets import *
 from typing import Callable
 
@@ -19,29 +19,50 @@ from typing import Callable
 class Row:
     """A row of widgets."""
 
+    __slots__ = ("_category", "_items", "_combo_box", "_add_button",
+                 "_remove_button", "_add_method", "_remove_method")
+
     def __init__(self,
                  category: MenuCategory,
+                 items: list[MenuItem],
                  combo_box: QComboBox,
                  add_button: QPushButton,
                  remove_button: QPushButton,
-                 add_method: Callable[[MenuCategory], None],
-                 remove_method: Callable[[MenuCategory], None]):
+                 add_method: Callable[["Row"], None],
+                 remove_method: Callable[["Row"], None]):
         """Connect the signal function for the buttons."""
         self._category = category
+        self._items = items
         self._combo_box = combo_box
         self._add_button = add_button
         self._remove_button = remove_button
+        self._add_method = add_method
+        self._remove_method = remove_method
 
         # Connect the signals.
-        self._add_button.clicked.connect(lambda: add_method(self._category))
-        self._remove_button.clicked.connect(lambda: (
-            remove_method(self._category)))
+        self._add_button.clicked.connect(self.add_button_clicked)
+        self._remove_button.clicked.connect(self.remove_button_clicked)
+
+    @Slot()
+    def add_button_clicked(self) -> None:
+        """Add the row's selected item."""
+        self._add_method(self)
+
+    @Slot()
+    def remove_button_clicked(self) -> None:
+        """Remove the row's selected item."""
+        self._remove_method(self)
 
     @property
     def category(self) -> MenuCategory:
         """Return the category for the row."""
         return self._category
 
+    @property
+    def items(self) -> list[MenuItem]:
+        """Return the items shown in the combo box."""
+        return self._items
+
     @property
     def combo_box(self) -> QComboBox:
         """Return the combo box for a category."""
@@ -58,21 +79,40 @@ class Row:
         return self._remove_button
 
 
-@dataclass
+@dataclass(slots=True)
 class CafeProgram:
     """The program to run."""
 
     _menu: Menu
     _order: Order
+    _view: CafeWindow = field(init=False, repr=False)
+    rows: list[Row] = field(init=False, repr=False)
+    _add_error_box: QMessageBox = field(init=False, repr=False)
+    _remove_error_box: QMessageBox = field(init=False, repr=False)
+    _order_complete_box: QMessageBox = field(init=False, repr=False)
+    _shown_order_version: int = field(init=False, repr=False, default=-1)
 
     def __post_init__(self) -> None:
         """Create the controller/presenter for the UI version."""
         # Add the view.
         self._view = CafeWindow()
-        self._view.show()
+
+        # Create the message dialogs once so they can be reused.
+        self._add_error_box = QMessageBox(
+            QMessageBox.Icon.Critical, "Add item error", "")
+        self._remove_error_box = QMessageBox(
+            QMessageBox.Icon.Critical, "Remove item error", "")
+        self._order_complete_box = QMessageBox(
+            QMessageBox.Icon.Information, "Order complete", "")
 
         # Keep track of the per-category widgets.
-        self.rows: list[Row] = []
+        self.rows = []
+
+        # Hold off redrawing and resizing the menu until all the rows have
+        # been added.
+        menu_layout = self._view.menu_widget_layout
+        menu_layout.setSizeConstraint(QLayout.SizeConstraint.SetNoConstraint)
+        self._view.setUpdatesEnabled(False)
 
         # Add items for each category.
         for category in MenuCategory:
@@ -87,9 +127,9 @@ class CafeProgram:
             combo_box = QComboBox()
             combo_box.setFixedWidth(400)
             items = self._menu.items_in_category(category)
-            for item in items:
-                combo_box.addItem(
-                    f"{format_price(item.price, '$')} - {item.name}")
+            combo_box.addItems(
+                [f"{item.price_text} - {item.name}"
+                 for item in items])
             row_layout.addWidget(combo_box)
             row_layout.addStretch()
 
@@ -100,6 +140,7 @@ class CafeProgram:
             row_layout.addWidget(remove_button)
 
             self.rows.append(Row(category,
+                                 items,
                                  combo_box,
                                  add_button,
                                  remove_button,
@@ -108,66 +149,62 @@ class CafeProgram:
 
             # Add a row. Codespace might show an error, but the layout is
             # definitely a QVBoxLayout.
-            self._view.menu_widget_layout.addLayout(row_layout)
+            menu_layout.addLayout(row_layout)
+
+        menu_layout.setSizeConstraint(
+            QLayout.SizeConstraint.SetDefaultConstraint)
+        self._view.setUpdatesEnabled(True)
 
         # Connect signal function for the finalise button.
         self._view.finalise_order_button.clicked.connect(
             self.finalise_order_button_clicked)
 
+        # Only show the view once it has been fully built.
+        self._view.show()
+
     def update_ui(self) -> None:
         """Update the UI after an item is added/removed."""
-        self._view.order_label.setText(str(self._order))
+        # Only set the label if the order has changed, to avoid a repaint.
+        if self._order.version != self._shown_order_version:
+            self._view.order_label.setText(str(self._order))
+            self._shown_order_version = self._order.version
 
-    def add_item_from_combobox(self, category: MenuCategory) -> None:
+    def add_item_from_combobox(self, row: Row) -> None:
         """Add an item from a combo box to the order."""
         # Determine the current item based on the combo box's index.
-        index = self.rows[category.value].combo_box.currentIndex()
-        item = self._menu.items_in_category(category)[index]
+        item = row.items[row.combo_box.currentIndex()]
 
         # Try adding the item.
         try:
             self._order.add_item(item)
             self.update_ui()
         except RuntimeError as error:
-            QMessageBox(
-                QMessageBox.Icon.Critical,
-                "Add item error",
-                str(error)
-            ).exec()
+            self._add_error_box.setText(str(error))
+            self._add_error_box.exec()
 
-    def remove_item_from_combobox(self, category: MenuCategory) -> None:
+    def remove_item_from_combobox(self, row: Row) -> None:
         """Remove an item the order based on the selection in the combo box."""
         # Determine the current item based on the combo box's index.
-        index = self.rows[category.value].combo_box.currentIndex()
-        item = self._menu.items_in_category(category)[index]
+        item = row.items[row.combo_box.currentIndex()]
 
         # Try adding the item.
         try:
             self._order.remove_item(item)
             self.update_ui()
         except RuntimeError as error:
-            QMessageBox(
-                QMessageBox.Icon.Critical,
-                "Remove item error",
-                str(error)
-            ).exec()
+            self._remove_error_box.setText(str(error))
+            self._remove_error_box.exec()
 
+    @Slot(bool)
     def finalise_order_button_clicked(self, checked: bool) -> None:
         """Show the finalise order button window."""
         window = FinaliseOrderWindow()
         result = window.exec()
         if result:
-            # Remove the items from stock.
-            for item_name in self._order.items.keys():
-                count = self._order.items[item_name]
-                item = self._menu.item_named(item_name)
-                self._menu.sell_item(item, count)
-            QMessageBox(
-                QMessageBox.Icon.Information,
-                "Order complete",
-                f""" Your order has been sent to the café.
+            message = f""" Your order has been sent to the café.
 Please pay {format_price(self._order.order_total, '$')} at lunch time.
 Quote the order for {window.first_name} {window.last_name}. Thank you!"""
-            ).exec()
-            self._order = Order(self._menu)
+            self._order_complete_box.setText(message)
+            self._order_complete_box.exec()
+            self._order.clear()
             self.update_ui()
@@ -31,22 +31,22 @@ def read_menu() -> Menu:
     except json.decoder.JSONDecodeError:
         print("Unable to parse JSON.")
 
-    menu_items: list[MenuItem] = []
-
-    # Create objects from the dictionary.
-    for item_name in menu_json.keys():
-        # Convert the price.
-        price_text = menu_json[item_name]["price"]
-        price = float(price_text)
-
-        # Convert the category.
-        category_text = menu_json[item_name]["category"]
-        category_number = int(category_text)
-        category = MenuCategory(category_number)
-
-        # Add the item to the list.
-        item = MenuItem(item_name, price, category)
-        menu_items.append(item)
+    # Look up each category by its number.
+    categories = {category.value: category for category in MenuCategory}
+
+    def category_numbered(number: int) -> MenuCategory:
+        """Return the category with a given number, as MenuCategory would."""
+        try:
+            return categories[number]
+        except KeyError:
+            raise ValueError(f"{number} is not a valid MenuCategory") from None
+
+    # Create objects from the dictionary in a single pass.
+    menu_items = [
+        MenuItem(item_name,
+                 float(item_json["price"]),
+                 category_numbered(int(item_json["category"])))
+        for item_name, item_json in menu_json.items()]
 
     return Menu(menu_items)
 
@@ -9,12 +9,17 @@ Created on 2023-06-11.
 
 
 from enum import Enum
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+from functools import lru_cache
+from types import MappingProxyType
+import sys
 import json
+from PySide6.QtCore import Qt, Slot
 from PySide6.QtWidgets import *
 from typing import Callable
 
 
+@lru_cache(maxsize=512)
 def format_price(price: float, symbol: str, prefix: bool = True) -> str:
     """
     Format a price float as text.
@@ -27,9 +32,12 @@ def format_price(price: float, symbol: str, prefix: bool = True) -> str:
     - prefix (bool): whether the symbol goes at the front (True)/end (False).
 
     Returns a formatted string containing the price.
+
+    Results are cached, as the same prices are formatted repeatedly.
     """
-    return f"{symbol if prefix else ''}{price:.2f}\
-{symbol if not prefix else ''}"
+    if prefix:
+        return f"{symbol}{price:.2f}"
+    return f"{price:.2f}{symbol}"
 
 
 class MenuCategory(Enum):
@@ -42,53 +50,67 @@ class MenuCategory(Enum):
 
     def __str__(self) -> str:
         """Return the name of the category in human-readable form."""
-        match self:
-            case MenuCategory.FOOD: return "Food"
-            case MenuCategory.RICE: return "Rice meals"
-            case MenuCategory.DRINKS: return "Drinks"
+        return _CATEGORY_NAMES[self]
 
 
-@dataclass
-class MenuItem:
-    """An item on the menu."""
+# Human-readable names for each category.
+_CATEGORY_NAMES: dict[MenuCategory, str] = {
+    MenuCategory.FOOD: "Food",
+    MenuCategory.RICE: "Rice meals",
+    MenuCategory.DRINKS: "Drinks",
+}
 
-    _name: str
-    _price: float
-    _category: MenuCategory
 
-    @property
-    def name(self) -> str:
-        """The name of the item."""
-        return self._name
+@dataclass(frozen=True, slots=True, eq=False)
+class MenuItem:
+    """
+    An item on the menu.
 
-    @property
-    def price(self) -> float:
-        """The price of the item as a number."""
-        return self._price
+    Each item on the menu is a single object, so items are compared and
+    hashed by identity.
+    """
 
-    @property
-    def price_text(self) -> str:
-        """The price of the item as text."""
-        return format_price(self.price, "$")
+    # The name, price and category of the item.
+    name: str
+    price: float
+    category: MenuCategory
 
-    @property
-    def category(self) -> MenuCategory:
-        """The category of the item."""
-        return self._category
+    # The price of the item as text.
+    price_text: str = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        """Intern the name and format the price text once."""
+        # The item is frozen, so the fields have to be set through object.
+        object.__setattr__(self, "name", sys.intern(self.name))
+        object.__setattr__(self, "price_text", format_price(self.price, "$"))
 
 
-@dataclass
+@dataclass(slots=True)
 class Menu:
     """All items on the menu, including stock."""
 
     _items: list[MenuItem]
+    _stock: dict[str, int] = field(init=False, repr=False)
+    _items_by_name: dict[str, MenuItem] = field(init=False, repr=False)
+    _items_by_category: dict[MenuCategory, list[MenuItem]] = field(
+        init=False, repr=False)
 
     def __post_init__(self) -> None:
         """Create a stock dictionary based on the items passed in."""
-        self._stock: dict[str, int] = {}
+        self._stock = {}
         for item in self._items:
             self._stock[item.name] = 20
 
+        # Index the items by name for quick lookup.
+        self._items_by_name = {
+            item.name: item for item in self._items}
+
+        # Group the items by category, keeping their order from the menu.
+        self._items_by_category = {
+            category: [] for category in MenuCategory}
+        for item in self._items:
+            self._items_by_category[item.category].append(item)
+
     def item_named(self, name: str) -> MenuItem:
         """
         Return the item matching a given name.
@@ -98,34 +120,39 @@ class Menu:
 
         Raises an exception if no such item is found.
         """
-        # Search the list of items for one with a corresponding name.
-        for item in self._items:
-            if item.name == name:
-                return item
-
-        # If no item was found, raise an exception.
-        raise NameError(f"No such item '{name}'")
+        # Look up the item by its name, raising an exception if no item was
+        # found.
+        try:
+            return self._items_by_name[name]
+        except KeyError:
+            raise NameError(f"No such item '{name}'")
 
     def items_in_category(self, category: MenuCategory) -> list[MenuItem]:
         """All items in a given category."""
-        items = []
-
-        # Search the list of items for any with a matching category,
-        # then add it to the items list.
-        for item in self._items:
-            if item.category == category:
-                items.append(item)
-
-        return items
+        return self._items_by_category[category]
 
     def stock_for_item(self, item: MenuItem) -> int:
         """Return the amount in stock for a given item."""
         return self._stock[item.name]
 
-    def sell_item(self, item: MenuItem, count: int) -> None:
-        """Sell the given number of items."""
-        stock_count = self._stock[item.name]
-        self._stock[item.name] = stock_count - count
+    def reserve_item(self, item: MenuItem) -> int:
+        """
+        Take 1 of an item out of stock, returning the amount left.
+
+        Raises an exception if the item is out of stock.
+        """
+        stock = self._stock[item.name]
+        if stock == 0:
+            raise RuntimeError(f"No stock for {item.name}")
+
+        self._stock[item.name] = stock - 1
+        return stock - 1
+
+    def release_item(self, item: MenuItem) -> int:
+        """Put 1 of an item back into stock, returning the amount left."""
+        stock = self._stock[item.name] + 1
+        self._stock[item.name] = stock
+        return stock
 
 
 class Order:
@@ -134,44 +161,66 @@ class Order:
     # Constants.
     MAX_ITEM_COUNT = 2
 
+    __slots__ = ("_menu", "_items", "_items_view", "_order_total", "_text",
+                 "_version")
+
     def __init__(self, menu: Menu) -> None:
         """Create the order."""
         self._menu = menu
-        self._items: dict[str, int] = {}
+        self._items: dict[MenuItem, int] = {}
+
+        # Share a read-only view of the items with callers.
+        self._items_view = MappingProxyType(self._items)
+
+        # Keep a running total so it doesn't need to be recalculated.
+        self._order_total = 0.0
+
+        # Keep the pretty-printed order until the order changes.
+        self._text: str | None = None
+
+        # Count the changes made to the order.
+        self._version = 0
 
     def __str__(self) -> str:
         """Pretty-printed version of the current order."""
-        text = ""
+        if self._text is None:
+            # Add the items to each line.
+            lines = [f"{count}x {item.name}\n"
+                     for item, count in self._items.items()]
 
-        # Add the items to each line.
-        for item in self._items.keys():
-            count = self._items[item]
-            text = text + f"{count}x {item}\n"
+            # Show the order total price.
+            lines.append("\nTOTAL: " + format_price(self.order_total, "$"))
 
-        # Show the order total price.
-        text = text + "\n" + "TOTAL: " + format_price(self.order_total, "$")
+            self._text = "".join(lines)
 
-        return text
+        return self._text
 
     @property
-    def items(self) -> dict[str, int]:
-        """The items in the order."""
-        return self._items
+    def items(self) -> MappingProxyType[MenuItem, int]:
+        """The items in the order (read-only)."""
+        return self._items_view
+
+    @property
+    def version(self) -> int:
+        """The number of times the order has changed."""
+        return self._version
 
     @property
     def order_total(self) -> float:
         """The cost of the order so far."""
-        running_total = 0.0
+        return self._order_total
 
-        # Loop over every item in the list to find the corresponding price of
-        # the item in the menu, then multiply the purchase amount by that
-        # price to find the cost.
-        for item_name in self._items.keys():
-            item = self._menu.item_named(item_name)
-            count = self._items[item_name]
-            running_total = running_total + (item.price * count)
+    def clear(self) -> None:
+        """
+        Remove all items from the order, ready for the next customer.
 
-        return running_total
+        The items were taken out of stock as they were added, so they stay
+        sold.
+        """
+        self._items.clear()
+        self._order_total = 0.0
+        self._text = None
+        self._version = self._version + 1
 
     def add_item(self, item: MenuItem) -> None:
         """
@@ -179,24 +228,26 @@ class Order:
 
         Raises an exception if no more items can be added.
         """
-        # Check if the item is in stock. If not, raise an exception.
-        if self._menu.stock_for_item(item) == 0:
-            raise RuntimeError(f"No stock for {item.name}")
+        # Take the item out of stock so it can't be sold twice. This raises
+        # an exception if the item is out of stock.
+        self._menu.reserve_item(item)
+
+        # Otherwise, if the item is in stock, find how many are already in
+        # the order (0 if the item isn't in the order yet).
+        count = self._items.get(item, 0)
+
+        if count >= self.MAX_ITEM_COUNT:
+            # There are already the maximum allowed number of this item, so
+            # put the item back into stock.
+            self._menu.release_item(item)
+            raise RuntimeError(f"Cannot order more than \
+{self.MAX_ITEM_COUNT} of {item.name}")
 
-        # Otherwise, if the item is in stock…
-        if item.name in self._items.keys():
-            # The item already exists.
-            count = self._items[item.name]
+        self._items[item] = count + 1
 
-            if count == self.MAX_ITEM_COUNT:
-                # There are already the maximum allowed number of this item.
-                raise RuntimeError(f"Cannot order more than \
-{self.MAX_ITEM_COUNT} of {item.name}")
-            else:
-                self._items[item.name] = count + 1
-        else:
-            # The item was not already in the order. Add it now.
-            self._items[item.name] = 1
+        self._order_total = self._order_total + item.price
+        self._text = None
+        self._version = self._version + 1
 
     def remove_item(self, item: MenuItem) -> None:
         """
@@ -205,16 +256,28 @@ class Order:
         Raises an exception if the item is not in the order.
         """
         # Raise an exception if no such item exists.
-        if item.name not in self._items.keys():
+        count = self._items.get(item, 0)
+        if count == 0:
             raise RuntimeError(f"No such item {item.name} in order.")
+
+        if count > 1:
+            # If there are more than 1 of the item, reduce by 1.
+            self._items[item] = count - 1
+        else:
+            # If there's only one, delete the key altogether.
+            del self._items[item]
+
+        # Put the item back into stock.
+        self._menu.release_item(item)
+
+        # Start again from 0 once the order is empty, so rounding errors in
+        # the running total don't leave it slightly below 0.
+        if self._items:
+            self._order_total = self._order_total - item.price
         else:
-            count = self._items[item.name]
-            if count > 1:
-                # If there are more than 1 of the item, reduce by 1.
-                self._items[item.name] = count - 1
-            else:
-                # If there's only one, delete the key altogether.
-                del self._items[item.name]
+            self._order_total = 0.0
+        self._text = None
+        self._version = self._version + 1
 
 
 class CafeWindow(QMainWindow):
@@ -236,7 +299,12 @@ class CafeWindow(QMainWindow):
         self.menu_widget.setLayout(self.menu_widget_layout)
         self.main_layout.addWidget(self.menu_widget)
 
+        # Show the order as plain text, so it isn't checked for rich text
+        # each time it changes.
         self.order_label = QLabel("")
+        self.order_label.setTextFormat(Qt.TextFormat.PlainText)
+        self.order_label.setTextInteractionFlags(
+            Qt.TextInteractionFlag.NoTextInteraction)
         self.main_layout.addWidget(self.order_label)
 
         # Add finalise order button.
@@ -267,9 +335,8 @@ class FinaliseOrderWindow(QDialog):
         self.first_name = ""
         self.last_name = ""
 
-        # Keep track of whether the names are non-empty.
-        self.first_name_valid = False
-        self.last_name_valid = False
+        # Keep track of whether the Save button is enabled.
+        self.save_enabled = False
 
         # Connect signal functions to disable the dialog buttons
         # if the line edits are empty.
@@ -286,51 +353,76 @@ class FinaliseOrderWindow(QDialog):
         self.buttonBox.rejected.connect(self.reject)
         self.main_layout.addWidget(self.buttonBox)
 
+    @Slot(str)
     def first_textEdited(self, text: str) -> None:
         """Update if the first name is non-empty."""
-        self.first_name_valid = len(text) > 0
         self.first_name = text
         self.update_ui()
 
+    @Slot(str)
     def last_textEdited(self, text: str) -> None:
         """Update if the last name is non-empty."""
-        self.last_name_valid = len(text) > 0
         self.last_name = text
         self.update_ui()
 
     def update_ui(self) -> None:
         """Enable the Save button if the name fields contain valid text."""
-        valid = self.first_name_valid and self.last_name_valid
-        self.buttonBox.button(
-            QDialogButtonBox.StandardButton.Save).setEnabled(valid)
+        valid = bool(self.first_name) and bool(self.last_name)
+
+        # Only update the button when its state changes.
+        if valid != self.save_enabled:
+            self.buttonBox.button(
+                QDialogButtonBox.StandardButton.Save).setEnabled(valid)
+            self.save_enabled = valid
 
 
 class Row:
     """A row of widgets."""
 
+    __slots__ = ("_category", "_items", "_combo_box", "_add_button",
+                 "_remove_button", "_add_method", "_remove_method")
+
     def __init__(self,
                  category: MenuCategory,
+                 items: list[MenuItem],
                  combo_box: QComboBox,
                  add_button: QPushButton,
                  remove_button: QPushButton,
-                 add_method: Callable[[MenuCategory], None],
-                 remove_method: Callable[[MenuCategory], None]):
+                 add_method: Callable[["Row"], None],
+                 remove_method: Callable[["Row"], None]):
         """Connect the signal function for the buttons."""
         self._category = category
+        self._items = items
         self._combo_box = combo_box
         self._add_button = add_button
         self._remove_button = remove_button
+        self._add_method = add_method
+        self._remove_method = remove_method
 
         # Connect the signals.
-        self._add_button.clicked.connect(lambda: add_method(self._category))
-        self._remove_button.clicked.connect(lambda: (
-            remove_method(self._category)))
+        self._add_button.clicked.connect(self.add_button_clicked)
+        self._remove_button.clicked.connect(self.remove_button_clicked)
+
+    @Slot()
+    def add_button_clicked(self) -> None:
+        """Add the row's selected item."""
+        self._add_method(self)
+
+    @Slot()
+    def remove_button_clicked(self) -> None:
+        """Remove the row's selected item."""
+        self._remove_method(self)
 
     @property
     def category(self) -> MenuCategory:
         """Return the category for the row."""
         return self._category
 
+    @property
+    def items(self) -> list[MenuItem]:
+        """Return the items shown in the combo box."""
+        return self._items
+
     @property
     def combo_box(self) -> QComboBox:
         """Return the combo box for a category."""
@@ -347,21 +439,40 @@ class Row:
         return self._remove_button
 
 
-@dataclass
+@dataclass(slots=True)
 class CafeProgram:
     """The program to run."""
 
     _menu: Menu
     _order: Order
+    _view: CafeWindow = field(init=False, repr=False)
+    rows: list[Row] = field(init=False, repr=False)
+    _add_error_box: QMessageBox = field(init=False, repr=False)
+    _remove_error_box: QMessageBox = field(init=False, repr=False)
+    _order_complete_box: QMessageBox = field(init=False, repr=False)
+    _shown_order_version: int = field(init=False, repr=False, default=-1)
 
     def __post_init__(self) -> None:
         """Create the controller/presenter for the UI version."""
         # Add the view.
         self._view = CafeWindow()
-        self._view.show()
+
+        # Create the message dialogs once so they can be reused.
+        self._add_error_box = QMessageBox(
+            QMessageBox.Icon.Critical, "Add item error", "")
+        self._remove_error_box = QMessageBox(
+            QMessageBox.Icon.Critical, "Remove item error", "")
+        self._order_complete_box = QMessageBox(
+            QMessageBox.Icon.Information, "Order complete", "")
 
         # Keep track of the per-category widgets.
-        self.rows: list[Row] = []
+        self.rows = []
+
+        # Hold off redrawing and resizing the menu until all the rows have
+        # been added.
+        menu_layout = self._view.menu_widget_layout
+        menu_layout.setSizeConstraint(QLayout.SizeConstraint.SetNoConstraint)
+        self._view.setUpdatesEnabled(False)
 
         # Add items for each category.
         for category in MenuCategory:
@@ -376,9 +487,9 @@ class CafeProgram:
             combo_box = QComboBox()
             combo_box.setFixedWidth(400)
             items = self._menu.items_in_category(category)
-            for item in items:
-                combo_box.addItem(
-                    f"{format_price(item.price, '$')} - {item.name}")
+            combo_box.addItems(
+                [f"{item.price_text} - {item.name}"
+                 for item in items])
             row_layout.addWidget(combo_box)
             row_layout.addStretch()
 
@@ -389,6 +500,7 @@ class CafeProgram:
             row_layout.addWidget(remove_button)
 
             self.rows.append(Row(category,
+                                 items,
                                  combo_box,
                                  add_button,
                                  remove_button,
@@ -397,69 +509,65 @@ class CafeProgram:
 
             # Add a row. Codespace might show an error, but the layout is
             # definitely a QVBoxLayout.
-            self._view.menu_widget_layout.addLayout(row_layout)
+            menu_layout.addLayout(row_layout)
+
+        menu_layout.setSizeConstraint(
+            QLayout.SizeConstraint.SetDefaultConstraint)
+        self._view.setUpdatesEnabled(True)
 
         # Connect signal function for the finalise button.
         self._view.finalise_order_button.clicked.connect(
             self.finalise_order_button_clicked)
 
+        # Only show the view once it has been fully built.
+        self._view.show()
+
     def update_ui(self) -> None:
         """Update the UI after an item is added/removed."""
-        self._view.order_label.setText(str(self._order))
+        # Only set the label if the order has changed, to avoid a repaint.
+        if self._order.version != self._shown_order_version:
+            self._view.order_label.setText(str(self._order))
+            self._shown_order_version = self._order.version
 
-    def add_item_from_combobox(self, category: MenuCategory) -> None:
+    def add_item_from_combobox(self, row: Row) -> None:
         """Add an item from a combo box to the order."""
         # Determine the current item based on the combo box's index.
-        index = self.rows[category.value].combo_box.currentIndex()
-        item = self._menu.items_in_category(category)[index]
+        item = row.items[row.combo_box.currentIndex()]
 
         # Try adding the item.
         try:
             self._order.add_item(item)
             self.update_ui()
         except RuntimeError as error:
-            QMessageBox(
-                QMessageBox.Icon.Critical,
-                "Add item error",
-                str(error)
-            ).exec()
+            self._add_error_box.setText(str(error))
+            self._add_error_box.exec()
 
-    def remove_item_from_combobox(self, category: MenuCategory) -> None:
+    def remove_item_from_combobox(self, row: Row) -> None:
         """Remove an item the order based on the selection in the combo box."""
         # Determine the current item based on the combo box's index.
-        index = self.rows[category.value].combo_box.currentIndex()
-        item = self._menu.items_in_category(category)[index]
+        item = row.items[row.combo_box.currentIndex()]
 
         # Try adding the item.
         try:
             self._order.remove_item(item)
             self.update_ui()
         except RuntimeError as error:
-            QMessageBox(
-                QMessageBox.Icon.Critical,
-                "Remove item error",
-                str(error)
-            ).exec()
+            self._remove_error_box.setText(str(error))
+            self._remove_error_box.exec()
 
+    @Slot(bool)
     def finalise_order_button_clicked(self, checked: bool) -> None:
         """Show the finalise order button window."""
         window = FinaliseOrderWindow()
         result = window.exec()
         if result:
-            # Remove the items from stock.
-            for item_name in self._order.items.keys():
-                count = self._order.items[item_name]
-                item = self._menu.item_named(item_name)
-                self._menu.sell_item(item, count)
-            QMessageBox(
-                QMessageBox.Icon.Information,
-                "Order complete",
-                f"""Thank you {window.first_name} {window.last_name}.
+            message = f"""Thank you {window.first_name} {window.last_name}.
 Your order has been sent to the café.
 
 Please pay {format_price(self._order.order_total, '$')} at lunch time."""
-            ).exec()
-            self._order = Order(self._menu)
+            self._order_complete_box.setText(message)
+            self._order_complete_box.exec()
+            self._order.clear()
             self.update_ui()
 
 
@@ -480,22 +588,22 @@ def read_menu() -> Menu:
     except json.decoder.JSONDecodeError:
         print("Unable to parse JSON.")
 
-    menu_items: list[MenuItem] = []
+    # Look up each category by its number.
+    categories = {category.value: category for category in MenuCategory}
 
-    # Create objects from the dictionary.
-    for item_name in menu_json.keys():
-        # Convert the price.
-        price_text = menu_json[item_name]["price"]
-        price = float(price_text)
-
-        # Convert the category.
-        category_text = menu_json[item_name]["category"]
-        category_number = int(category_text)
-        category = MenuCategory(category_number)
-
-        # Add the item to the list.
-        item = MenuItem(item_name, price, category)
-        menu_items.append(item)
+    def category_numbered(number: int) -> MenuCategory:
+        """Return the category with a given number, as MenuCategory would."""
+        try:
+            return categories[number]
+        except KeyError:
+            raise ValueError(f"{number} is not a valid MenuCategory") from None
+
+    # Create objects from the dictionary in a single pass.
+    menu_items = [
+        MenuItem(item_name,
+                 float(item_json["price"]),
+                 category_numbered(int(item_json["category"])))
+        for item_name, item_json in menu_json.items()]
 
     return Menu(menu_items)
 
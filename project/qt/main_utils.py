@@ -7,7 +7,10 @@ Created by Matua Doc.
 Created on 2023-06-11.
 """
 
+from functools import lru_cache
 
+
+@lru_cache(maxsize=512)
 def format_price(price: float, symbol: str, prefix: bool = True) -> str:
     """
     Format a price float as text.
@@ -20,6 +23,9 @@ def format_price(price: float, symbol: str, prefix: bool = True) -> str:
     - prefix (bool): whether the symbol goes at the front (True)/end (False).
 
     Returns a formatted string containing the price.
+
+    Results are cached, as the same prices are formatted repeatedly.
     """
-    return f"{symbol if prefix else ''}{price:.2f}\
-{symbol if not prefix else ''}"
+    if prefix:
+        return f"{symbol}{price:.2f}"
+    return f"{price:.2f}{symbol}"
@@ -7,6 +7,7 @@ Created by Matua Doc.
 Created on 2023-06-11.
 """
 
+from PySide6.QtCore import Qt, Slot
 from PySide6.QtWidgets import *
 
 
@@ -29,7 +30,12 @@ class CafeWindow(QMainWindow):
         self.menu_widget.setLayout(self.menu_widget_layout)
         self.main_layout.addWidget(self.menu_widget)
 
+        # Show the order as plain text, so it isn't checked for rich text
+        # each time it changes.
         self.order_label = QLabel("")
+        self.order_label.setTextFormat(Qt.TextFormat.PlainText)
+        self.order_label.setTextInteractionFlags(
+            Qt.TextInteractionFlag.NoTextInteraction)
         self.main_layout.addWidget(self.order_label)
 
         # Add finalise order button.
@@ -60,9 +66,8 @@ class FinaliseOrderWindow(QDialog):
         self.first_name = ""
         self.last_name = ""
 
-        # Keep track of whether the names are non-empty.
-        self.first_name_valid = False
-        self.last_name_valid = False
+        # Keep track of whether the Save button is enabled.
+        self.save_enabled = False
 
         # Connect signal functions to disable the dialog buttons
         # if the line edits are empty.
@@ -79,20 +84,24 @@ class FinaliseOrderWindow(QDialog):
         self.buttonBox.rejected.connect(self.reject)
         self.main_layout.addWidget(self.buttonBox)
 
+    @Slot(str)
     def first_textEdited(self, text: str) -> None:
         """Update if the first name is non-empty."""
-        self.first_name_valid = len(text) > 0
         self.first_name = text
         self.update_ui()
 
+    @Slot(str)
     def last_textEdited(self, text: str) -> None:
         """Update if the last name is non-empty."""
-        self.last_name_valid = len(text) > 0
         self.last_name = text
         self.update_ui()
 
     def update_ui(self) -> None:
         """Enable the Save button if the name fields contain valid text."""
-        valid = self.first_name_valid and self.last_name_valid
-        self.buttonBox.button(
-            QDialogButtonBox.StandardButton.Save).setEnabled(valid)
+        valid = bool(self.first_name) and bool(self.last_name)
+
+        # Only update the button when its state changes.
+        if valid != self.save_enabled:
+            self.buttonBox.button(
+                QDialogButtonBox.StandardButton.Save).setEnabled(valid)
+            self.save_enabled = valid
@@ -14,6 +14,17 @@ from main_utils import get_valid_bool, get_valid_input, get_valid_int
 from main_model import Menu, MenuCategory, MenuItem, Order
 
 
+# The categories in order, and the list of them shown to the user.
+_CATEGORIES = list(MenuCategory)
+_CATEGORY_CHOICES_TEXT = "\n".join(
+    f"{i + 1}. {category}" for i, category in enumerate(_CATEGORIES))
+
+# Fixed text shown while the program runs.
+_WELCOME_TEXT = "Welcome to OC Café.\n-------------------\n"
+_TASK_CHOICES_TEXT = "1. Add to order\n2. Remove from order\n3. Cancel"
+_ORDER_SPACING = "\n" * 5
+
+
 @dataclass
 class CafeProgram:
     """The program to run."""
@@ -24,9 +35,7 @@ class CafeProgram:
 
     def run(self) -> None:
         """Run the program."""
-        print("Welcome to OC Café.")
-        print("-------------------")
-        print()
+        print(_WELCOME_TEXT)
 
         while self._is_running:
             # Ask for a category.
@@ -38,29 +47,24 @@ class CafeProgram:
             print()
 
             # Ask if the user is adding or removing.
-            print("""1. Add to order
-2. Remove from order
-3. Cancel""")
+            print(_TASK_CHOICES_TEXT)
             task_choice = get_valid_int("Enter a choice: ", 1, 3)
-            match task_choice:
-                case 1:
-                    # Adding to order.
-                    try:
-                        self._order.add_item(item)
-                    except RuntimeError as error:
-                        print(error)
-                case 2:
-                    # Removing from order.
-                    try:
-                        self._order.remove_item(item)
-                    except RuntimeError as error:
-                        print(error)
+            if task_choice == 1:
+                # Adding to order.
+                try:
+                    self._order.add_item(item)
+                except RuntimeError as error:
+                    print(error)
+            elif task_choice == 2:
+                # Removing from order.
+                try:
+                    self._order.remove_item(item)
+                except RuntimeError as error:
+                    print(error)
             print()
 
             # Show the current order.
-            print("Current order:")
-            print(self._order)
-            print("\n" * 5)
+            print(f"Current order:\n{self._order}\n{_ORDER_SPACING}")
 
             # Check if the user will finish their current order.
             prompt = "Press 'y' to purchase order, or 'n' to continue: "
@@ -76,23 +80,17 @@ class CafeProgram:
         """
         if category is None:
             # Category is None, so  print the list of categories.
-            for i, _ in enumerate(MenuCategory):
-                print(f"{i + 1}. {MenuCategory(i)}")
+            print(_CATEGORY_CHOICES_TEXT)
         else:
             # Print items in the specified category.
             for i, item in enumerate(self._menu.items_in_category(category)):
-                index = str(f"{i + 1}. ")
-                stock = str(f"{self._menu.stock_for_item(item)}x")
-
-                # Spaces from name to stock.
-                stock_spaces = " " * (50 - len(index) - len(item.name))
-                first_half = f"{index}{item.name}{stock_spaces}"
-
-                # Spaces from stock to price.
-                price_spaces = " " * (10 - len(stock) - len(item.price_text))
-                second_half = f"{stock}{price_spaces}{item.price_text}"
+                name = f"{i + 1}. {item.name}"
+                stock = f"{self._menu.stock_for_item(item)}x"
 
-                print(first_half + second_half)
+                # Pad the name to 50 characters, then right-align the price
+                # so the stock and price take up 10 characters.
+                price_width = 10 - len(stock)
+                print(f"{name:<50}{stock}{item.price_text:>{price_width}}")
 
     def ask_for_category(self) -> MenuCategory:
         """Ask the user for the menu category."""
@@ -100,11 +98,11 @@ class CafeProgram:
         self.print_menu_choices()
 
         # Ask the user for their choice.
-        count = len(MenuCategory)
+        count = len(_CATEGORIES)
         category_choice = get_valid_int("Enter a category: ", 1, count)
 
         # Determine the category by the user's choice.
-        category = MenuCategory(category_choice - 1)
+        category = _CATEGORIES[category_choice - 1]
 
         return category
 
@@ -126,18 +124,13 @@ class CafeProgram:
         first_name = get_valid_input("Enter first name: ")
         last_name = get_valid_input("Enter last name: ")
 
-        # Remove the items from stock.
-        for item_name in self._order.items.keys():
-            count = self._order.items[item_name]
-            item = self._menu.item_named(item_name)
-            self._menu.sell_item(item, count)
         print()
 
         # Reset the order for the next customer.
         print(f"Your order has been placed {first_name} {last_name}.")
         print(f"Please pay \
 {format_price(self._order.order_total, '$')} at lunch time.")
-        self._order = Order(self._menu)
+        self._order.clear()
 
         # Ask if the user should exit.
         if get_valid_bool("Press 'y' to exit, or 'n' to continue: "):
@@ -8,7 +8,9 @@ Created on 2023-06-11.
 """
 
 from enum import Enum
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+from types import MappingProxyType
+import sys
 
 from main_utils import format_price
 
@@ -23,53 +25,67 @@ class MenuCategory(Enum):
 
     def __str__(self) -> str:
         """Return the name of the category in human-readable form."""
-        match self:
-            case MenuCategory.FOOD: return "Food"
-            case MenuCategory.RICE: return "Rice meals"
-            case MenuCategory.DRINKS: return "Drinks"
+        return _CATEGORY_NAMES[self]
 
 
-@dataclass
-class MenuItem:
-    """An item on the menu."""
+# Human-readable names for each category.
+_CATEGORY_NAMES: dict[MenuCategory, str] = {
+    MenuCategory.FOOD: "Food",
+    MenuCategory.RICE: "Rice meals",
+    MenuCategory.DRINKS: "Drinks",
+}
 
-    _name: str
-    _price: float
-    _category: MenuCategory
 
-    @property
-    def name(self) -> str:
-        """The name of the item."""
-        return self._name
+@dataclass(frozen=True, slots=True, eq=False)
+class MenuItem:
+    """
+    An item on the menu.
 
-    @property
-    def price(self) -> float:
-        """The price of the item as a number."""
-        return self._price
+    Each item on the menu is a single object, so items are compared and
+    hashed by identity.
+    """
 
-    @property
-    def price_text(self) -> str:
-        """The price of the item as text."""
-        return format_price(self.price, "$")
+    # The name, price and category of the item.
+    name: str
+    price: float
+    category: MenuCategory
 
-    @property
-    def category(self) -> MenuCategory:
-        """The category of the item."""
-        return self._category
+    # The price of the item as text.
+    price_text: str = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        """Intern the name and format the price text once."""
+        # The item is frozen, so the fields have to be set through object.
+        object.__setattr__(self, "name", sys.intern(self.name))
+        object.__setattr__(self, "price_text", format_price(self.price, "$"))
 
 
-@dataclass
+@dataclass(slots=True)
 class Menu:
     """All items on the menu, including stock."""
 
     _items: list[MenuItem]
+    _stock: dict[str, int] = field(init=False, repr=False)
+    _items_by_name: dict[str, MenuItem] = field(init=False, repr=False)
+    _items_by_category: dict[MenuCategory, list[MenuItem]] = field(
+        init=False, repr=False)
 
     def __post_init__(self) -> None:
         """Create a stock dictionary based on the items passed in."""
-        self._stock: dict[str, int] = {}
+        self._stock = {}
         for item in self._items:
             self._stock[item.name] = 20
 
+        # Index the items by name for quick lookup.
+        self._items_by_name = {
+            item.name: item for item in self._items}
+
+        # Group the items by category, keeping their order from the menu.
+        self._items_by_category = {
+            category: [] for category in MenuCategory}
+        for item in self._items:
+            self._items_by_category[item.category].append(item)
+
     def item_named(self, name: str) -> MenuItem:
         """
         Return the item matching a given name.
@@ -79,34 +95,39 @@ class Menu:
 
         Raises an exception if no such item is found.
         """
-        # Search the list of items for one with a corresponding name.
-        for item in self._items:
-            if item.name == name:
-                return item
-
-        # If no item was found, raise an exception.
-        raise NameError(f"No such item '{name}'")
+        # Look up the item by its name, raising an exception if no item was
+        # found.
+        try:
+            return self._items_by_name[name]
+        except KeyError:
+            raise NameError(f"No such item '{name}'")
 
     def items_in_category(self, category: MenuCategory) -> list[MenuItem]:
         """All items in a given category."""
-        items = []
-
-        # Search the list of items for any with a matching category,
-        # then add it to the items list.
-        for item in self._items:
-            if item.category == category:
-                items.append(item)
-
-        return items
+        return self._items_by_category[category]
 
     def stock_for_item(self, item: MenuItem) -> int:
         """Return the amount in stock for a given item."""
         return self._stock[item.name]
 
-    def sell_item(self, item: MenuItem, count: int) -> None:
-        """Sell the given number of items."""
-        stock_count = self._stock[item.name]
-        self._stock[item.name] = stock_count - count
+    def reserve_item(self, item: MenuItem) -> int:
+        """
+        Take 1 of an item out of stock, returning the amount left.
+
+        Raises an exception if the item is out of stock.
+        """
+        stock = self._stock[item.name]
+        if stock == 0:
+            raise RuntimeError(f"No stock for {item.name}")
+
+        self._stock[item.name] = stock - 1
+        return stock - 1
+
+    def release_item(self, item: MenuItem) -> int:
+        """Put 1 of an item back into stock, returning the amount left."""
+        stock = self._stock[item.name] + 1
+        self._stock[item.name] = stock
+        return stock
 
 
 class Order:
@@ -115,44 +136,66 @@ class Order:
     # Constants.
     MAX_ITEM_COUNT = 2
 
+    __slots__ = ("_menu", "_items", "_items_view", "_order_total", "_text",
+                 "_version")
+
     def __init__(self, menu: Menu) -> None:
         """Create the order."""
         self._menu = menu
-        self._items: dict[str, int] = {}
+        self._items: dict[MenuItem, int] = {}
+
+        # Share a read-only view of the items with callers.
+        self._items_view = MappingProxyType(self._items)
+
+        # Keep a running total so it doesn't need to be recalculated.
+        self._order_total = 0.0
+
+        # Keep the pretty-printed order until the order changes.
+        self._text: str | None = None
+
+        # Count the changes made to the order.
+        self._version = 0
 
     def __str__(self) -> str:
         """Pretty-printed version of the current order."""
-        text = ""
+        if self._text is None:
+            # Add the items to each line.
+            lines = [f"{count}x {item.name}\n"
+                     for item, count in self._items.items()]
 
-        # Add the items to each line.
-        for item in self._items.keys():
-            count = self._items[item]
-            text = text + f"{count}x {item}\n"
+            # Show the order total price.
+            lines.append("\nTOTAL: " + format_price(self.order_total, "$"))
 
-        # Show the order total price.
-        text = text + "\n" + "TOTAL: " + format_price(self.order_total, "$")
+            self._text = "".join(lines)
 
-        return text
+        return self._text
 
     @property
-    def items(self) -> dict[str, int]:
-        """The items in the order."""
-        return self._items
+    def items(self) -> MappingProxyType[MenuItem, int]:
+        """The items in the order (read-only)."""
+        return self._items_view
+
+    @property
+    def version(self) -> int:
+        """The number of times the order has changed."""
+        return self._version
 
     @property
     def order_total(self) -> float:
         """The cost of the order so far."""
-        running_total = 0.0
+        return self._order_total
 
-        # Loop over every item in the list to find the corresponding price of
-        # the item in the menu, then multiply the purchase amount by that
-        # price to find the cost.
-        for item_name in self._items.keys():
-            item = self._menu.item_named(item_name)
-            count = self._items[item_name]
-            running_total = running_total + (item.price * count)
+    def clear(self) -> None:
+        """
+        Remove all items from the order, ready for the next customer.
 
-        return running_total
+        The items were taken out of stock as they were added, so they stay
+        sold.
+        """
+        self._items.clear()
+        self._order_total = 0.0
+        self._text = None
+        self._version = self._version + 1
 
     def add_item(self, item: MenuItem) -> None:
         """
@@ -160,24 +203,26 @@ class Order:
 
         Raises an exception if no more items can be added.
         """
-        # Check if the item is in stock. If not, raise an exception.
-        if self._menu.stock_for_item(item) == 0:
-            raise RuntimeError(f"No stock for {item.name}")
+        # Take the item out of stock so it can't be sold twice. This raises
+        # an exception if the item is out of stock.
+        self._menu.reserve_item(item)
+
+        # Otherwise, if the item is in stock, find how many are already in
+        # the order (0 if the item isn't in the order yet).
+        count = self._items.get(item, 0)
+
+        if count >= self.MAX_ITEM_COUNT:
+            # There are already the maximum allowed number of this item, so
+            # put the item back into stock.
+            self._menu.release_item(item)
+            raise RuntimeError(f"Cannot order more than \
+{self.MAX_ITEM_COUNT} of {item.name}")
 
-        # Otherwise, if the item is in stock…
-        if item.name in self._items.keys():
-            # The item already exists.
-            count = self._items[item.name]
+        self._items[item] = count + 1
 
-            if count == self.MAX_ITEM_COUNT:
-                # There are already the maximum allowed number of this item.
-                raise RuntimeError(f"Cannot order more than \
-{self.MAX_ITEM_COUNT} of {item.name}")
-            else:
-                self._items[item.name] = count + 1
-        else:
-            # The item was not already in the order. Add it now.
-            self._items[item.name] = 1
+        self._order_total = self._order_total + item.price
+        self._text = None
+        self._version = self._version + 1
 
     def remove_item(self, item: MenuItem) -> None:
         """
@@ -186,13 +231,25 @@ class Order:
         Raises an exception if the item is not in the order.
         """
         # Raise an exception if no such item exists.
-        if item.name not in self._items.keys():
+        count = self._items.get(item, 0)
+        if count == 0:
             raise RuntimeError(f"No such item {item.name} in order.")
+
+        if count > 1:
+            # If there are more than 1 of the item, reduce by 1.
+            self._items[item] = count - 1
+        else:
+            # If there's only one, delete the key altogether.
+            del self._items[item]
+
+        # Put the item back into stock.
+        self._menu.release_item(item)
+
+        # Start again from 0 once the order is empty, so rounding errors in
+        # the running total don't leave it slightly below 0.
+        if self._items:
+            self._order_total = self._order_total - item.price
         else:
-            count = self._items[item.name]
-            if count > 1:
-                # If there are more than 1 of the item, reduce by 1.
-                self._items[item.name] = count - 1
-            else:
-                # If there's only one, delete the key altogether.
-                del self._items[item.name]
+            self._order_total = 0.0
+        self._text = None
+        self._version = self._version + 1
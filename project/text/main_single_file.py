@@ -9,7 +9,11 @@ Created on 2023-06-11.
 
 
 from enum import Enum
-from dataclasses import dataclass
+import csv
+from dataclasses import dataclass, field
+from functools import lru_cache
+from types import MappingProxyType
+import sys
 
 
 def get_valid_input(prompt: str) -> str:
@@ -25,20 +29,17 @@ def get_valid_input(prompt: str) -> str:
 
 def get_valid_int(prompt: str, min: int, max: int) -> int:
     """Continually ask for user input until a valid int is given."""
-    user_int: int | None = None
-
-    # Loop until user_int is a valid number.
-    while not user_int:
+    # Loop until a valid number is given.
+    while True:
         try:
             user_int = int(get_valid_input(prompt))
-
-            # Reset user_int to None if the number is out of bounds.
-            if user_int < min or user_int > max:
-                user_int = None
         except ValueError:
             print("Please enter a valid number.")
+            continue
 
-    return user_int
+        # Only return the number if it is within bounds.
+        if min <= user_int <= max:
+            return user_int
 
 
 def get_valid_bool(prompt: str) -> bool:
@@ -59,6 +60,7 @@ def get_valid_bool(prompt: str) -> bool:
     return user_bool
 
 
+@lru_cache(maxsize=512)
 def format_price(price: float, symbol: str, prefix: bool = True) -> str:
     """
     Format a price float as text.
@@ -71,9 +73,12 @@ def format_price(price: float, symbol: str, prefix: bool = True) -> str:
     - prefix (bool): whether the symbol goes at the front (True)/end (False).
 
     Returns a formatted string containing the price.
+
+    Results are cached, as the same prices are formatted repeatedly.
     """
-    return f"{symbol if prefix else ''}{price:.2f}\
-{symbol if not prefix else ''}"
+    if prefix:
+        return f"{symbol}{price:.2f}"
+    return f"{price:.2f}{symbol}"
 
 
 class MenuCategory(Enum):
@@ -86,53 +91,67 @@ class MenuCategory(Enum):
 
     def __str__(self) -> str:
         """Return the name of the category in human-readable form."""
-        match self:
-            case MenuCategory.FOOD: return "Food"
-            case MenuCategory.RICE: return "Rice meals"
-            case MenuCategory.DRINKS: return "Drinks"
+        return _CATEGORY_NAMES[self]
 
 
-@dataclass
-class MenuItem:
-    """An item on the menu."""
+# Human-readable names for each category.
+_CATEGORY_NAMES: dict[MenuCategory, str] = {
+    MenuCategory.FOOD: "Food",
+    MenuCategory.RICE: "Rice meals",
+    MenuCategory.DRINKS: "Drinks",
+}
 
-    _name: str
-    _price: float
-    _category: MenuCategory
 
-    @property
-    def name(self) -> str:
-        """The name of the item."""
-        return self._name
+@dataclass(frozen=True, slots=True, eq=False)
+class MenuItem:
+    """
+    An item on the menu.
 
-    @property
-    def price(self) -> float:
-        """The price of the item as a number."""
-        return self._price
+    Each item on the menu is a single object, so items are compared and
+    hashed by identity.
+    """
 
-    @property
-    def price_text(self) -> str:
-        """The price of the item as text."""
-        return format_price(self.price, "$")
+    # The name, price and category of the item.
+    name: str
+    price: float
+    category: MenuCategory
 
-    @property
-    def category(self) -> MenuCategory:
-        """The category of the item."""
-        return self._category
+    # The price of the item as text.
+    price_text: str = field(init=False, repr=False, compare=False)
 
+    def __post_init__(self) -> None:
+        """Intern the name and format the price text once."""
+        # The item is frozen, so the fields have to be set through object.
+        object.__setattr__(self, "name", sys.intern(self.name))
+        object.__setattr__(self, "price_text", format_price(self.price, "$"))
 
-@dataclass
+
+@dataclass(slots=True)
 class Menu:
     """All items on the menu, including stock."""
 
     _items: list[MenuItem]
+    _stock: dict[str, int] = field(init=False, repr=False)
+    _items_by_name: dict[str, MenuItem] = field(init=False, repr=False)
+    _items_by_category: dict[MenuCategory, list[MenuItem]] = field(
+        init=False, repr=False)
 
     def __post_init__(self) -> None:
         """Create a stock dictionary based on the items passed in."""
-        self._stock: dict[str, int] = {}
+        self._stock = {}
         for item in self._items:
             self._stock[item.name] = 20
 
+        # Index the items by name for quick lookup.
+        self._items_by_name = {
+            item.name: item for item in self._items}
+
+        # Group the items by category, keeping their order from the menu.
+        self._items_by_category = {
+            category: [] for category in MenuCategory}
+        for item in self._items:
+            self._items_by_category[item.category].append(item)
+
     def item_named(self, name: str) -> MenuItem:
         """
         Return the item matching a given name.
@@ -142,34 +161,39 @@ class Menu:
 
         Raises an exception if no such item is found.
         """
-        # Search the list of items for one with a corresponding name.
-        for item in self._items:
-            if item.name == name:
-                return item
-
-        # If no item was found, raise an exception.
-        raise NameError(f"No such item '{name}'")
+        # Look up the item by its name, raising an exception if no item was
+        # found.
+        try:
+            return self._items_by_name[name]
+        except KeyError:
+            raise NameError(f"No such item '{name}'")
 
     def items_in_category(self, category: MenuCategory) -> list[MenuItem]:
         """All items in a given category."""
-        items = []
-
-        # Search the list of items for any with a matching category,
-        # then add it to the items list.
-        for item in self._items:
-            if item.category == category:
-                items.append(item)
-
-        return items
+        return self._items_by_category[category]
 
     def stock_for_item(self, item: MenuItem) -> int:
         """Return the amount in stock for a given item."""
         return self._stock[item.name]
 
-    def sell_item(self, item: MenuItem, count: int) -> None:
-        """Sell the given number of items."""
-        stock_count = self._stock[item.name]
-        self._stock[item.name] = stock_count - count
+    def reserve_item(self, item: MenuItem) -> int:
+        """
+        Take 1 of an item out of stock, returning the amount left.
+
+        Raises an exception if the item is out of stock.
+        """
+        stock = self._stock[item.name]
+        if stock == 0:
+            raise RuntimeError(f"No stock for {item.name}")
+
+        self._stock[item.name] = stock - 1
+        return stock - 1
+
+    def release_item(self, item: MenuItem) -> int:
+        """Put 1 of an item back into stock, returning the amount left."""
+        stock = self._stock[item.name] + 1
+        self._stock[item.name] = stock
+        return stock
 
 
 class Order:
@@ -178,44 +202,66 @@ class Order:
     # Constants.
     MAX_ITEM_COUNT = 2
 
+    __slots__ = ("_menu", "_items", "_items_view", "_order_total", "_text",
+                 "_version")
+
     def __init__(self, menu: Menu) -> None:
         """Create the order."""
         self._menu = menu
-        self._items: dict[str, int] = {}
+        self._items: dict[MenuItem, int] = {}
+
+        # Share a read-only view of the items with callers.
+        self._items_view = MappingProxyType(self._items)
+
+        # Keep a running total so it doesn't need to be recalculated.
+        self._order_total = 0.0
+
+        # Keep the pretty-printed order until the order changes.
+        self._text: str | None = None
+
+        # Count the changes made to the order.
+        self._version = 0
 
     def __str__(self) -> str:
         """Pretty-printed version of the current order."""
-        text = ""
+        if self._text is None:
+            # Add the items to each line.
+            lines = [f"{count}x {item.name}\n"
+                     for item, count in self._items.items()]
 
-        # Add the items to each line.
-        for item in self._items.keys():
-            count = self._items[item]
-            text = text + f"{count}x {item}\n"
+            # Show the order total price.
+            lines.append("\nTOTAL: " + format_price(self.order_total, "$"))
 
-        # Show the order total price.
-        text = text + "\n" + "TOTAL: " + format_price(self.order_total, "$")
+            self._text = "".join(lines)
 
-        return text
+        return self._text
 
     @property
-    def items(self) -> dict[str, int]:
-        """The items in the order."""
-        return self._items
+    def items(self) -> MappingProxyType[MenuItem, int]:
+        """The items in the order (read-only)."""
+        return self._items_view
+
+    @property
+    def version(self) -> int:
+        """The number of times the order has changed."""
+        return self._version
 
     @property
     def order_total(self) -> float:
         """The cost of the order so far."""
-        running_total = 0.0
+        return self._order_total
 
-        # Loop over every item in the list to find the corresponding price of
-        # the item in the menu, then multiply the purchase amount by that
-        # price to find the cost.
-        for item_name in self._items.keys():
-            item = self._menu.item_named(item_name)
-            count = self._items[item_name]
-            running_total = running_total + (item.price * count)
+    def clear(self) -> None:
+        """
+        Remove all items from the order, ready for the next customer.
 
-        return running_total
+        The items were taken out of stock as they were added, so they stay
+        sold.
+        """
+        self._items.clear()
+        self._order_total = 0.0
+        self._text = None
+        self._version = self._version + 1
 
     def add_item(self, item: MenuItem) -> None:
         """
@@ -223,24 +269,26 @@ class Order:
 
         Raises an exception if no more items can be added.
         """
-        # Check if the item is in stock. If not, raise an exception.
-        if self._menu.stock_for_item(item) == 0:
-            raise RuntimeError(f"No stock for {item.name}")
+        # Take the item out of stock so it can't be sold twice. This raises
+        # an exception if the item is out of stock.
+        self._menu.reserve_item(item)
+
+        # Otherwise, if the item is in stock, find how many are already in
+        # the order (0 if the item isn't in the order yet).
+        count = self._items.get(item, 0)
+
+        if count >= self.MAX_ITEM_COUNT:
+            # There are already the maximum allowed number of this item, so
+            # put the item back into stock.
+            self._menu.release_item(item)
+            raise RuntimeError(f"Cannot order more than \
+{self.MAX_ITEM_COUNT} of {item.name}")
 
-        # Otherwise, if the item is in stock…
-        if item.name in self._items.keys():
-            # The item already exists.
-            count = self._items[item.name]
+        self._items[item] = count + 1
 
-            if count == self.MAX_ITEM_COUNT:
-                # There are already the maximum allowed number of this item.
-                raise RuntimeError(f"Cannot order more than \
-{self.MAX_ITEM_COUNT} of {item.name}")
-            else:
-                self._items[item.name] = count + 1
-        else:
-            # The item was not already in the order. Add it now.
-            self._items[item.name] = 1
+        self._order_total = self._order_total + item.price
+        self._text = None
+        self._version = self._version + 1
 
     def remove_item(self, item: MenuItem) -> None:
         """
@@ -249,16 +297,39 @@ class Order:
         Raises an exception if the item is not in the order.
         """
         # Raise an exception if no such item exists.
-        if item.name not in self._items.keys():
+        count = self._items.get(item, 0)
+        if count == 0:
             raise RuntimeError(f"No such item {item.name} in order.")
+
+        if count > 1:
+            # If there are more than 1 of the item, reduce by 1.
+            self._items[item] = count - 1
+        else:
+            # If there's only one, delete the key altogether.
+            del self._items[item]
+
+        # Put the item back into stock.
+        self._menu.release_item(item)
+
+        # Start again from 0 once the order is empty, so rounding errors in
+        # the running total don't leave it slightly below 0.
+        if self._items:
+            self._order_total = self._order_total - item.price
         else:
-            count = self._items[item.name]
-            if count > 1:
-                # If there are more than 1 of the item, reduce by 1.
-                self._items[item.name] = count - 1
-            else:
-                # If there's only one, delete the key altogether.
-                del self._items[item.name]
+            self._order_total = 0.0
+        self._text = None
+        self._version = self._version + 1
+
+
+# The categories in order, and the list of them shown to the user.
+_CATEGORIES = list(MenuCategory)
+_CATEGORY_CHOICES_TEXT = "\n".join(
+    f"{i + 1}. {category}" for i, category in enumerate(_CATEGORIES))
+
+# Fixed text shown while the program runs.
+_WELCOME_TEXT = "Welcome to OC Café.\n-------------------\n"
+_TASK_CHOICES_TEXT = "1. Add to order\n2. Remove from order\n3. Cancel"
+_ORDER_SPACING = "\n" * 5
 
 
 @dataclass
@@ -271,9 +342,7 @@ class CafeProgram:
 
     def run(self) -> None:
         """Run the program."""
-        print("Welcome to OC Café.")
-        print("-------------------")
-        print()
+        print(_WELCOME_TEXT)
 
         while self._is_running:
             # Ask for a category.
@@ -285,29 +354,24 @@ class CafeProgram:
             print()
 
             # Ask if the user is adding or removing.
-            print("""1. Add to order
-2. Remove from order
-3. Cancel""")
+            print(_TASK_CHOICES_TEXT)
             task_choice = get_valid_int("Enter a choice: ", 1, 3)
-            match task_choice:
-                case 1:
-                    # Adding to order.
-                    try:
-                        self._order.add_item(item)
-                    except RuntimeError as error:
-                        print(error)
-                case 2:
-                    # Removing from order.
-                    try:
-                        self._order.remove_item(item)
-                    except RuntimeError as error:
-                        print(error)
+            if task_choice == 1:
+                # Adding to order.
+                try:
+                    self._order.add_item(item)
+                except RuntimeError as error:
+                    print(error)
+            elif task_choice == 2:
+                # Removing from order.
+                try:
+                    self._order.remove_item(item)
+                except RuntimeError as error:
+                    print(error)
             print()
 
             # Show the current order.
-            print("Current order:")
-            print(self._order)
-            print("\n" * 5)
+            print(f"Current order:\n{self._order}\n{_ORDER_SPACING}")
 
             # Check if the user will finish their current order.
             prompt = "Press 'y' to purchase order, or 'n' to continue: "
@@ -323,23 +387,17 @@ class CafeProgram:
         """
         if category is None:
             # Category is None, so  print the list of categories.
-            for i, _ in enumerate(MenuCategory):
-                print(f"{i + 1}. {MenuCategory(i)}")
+            print(_CATEGORY_CHOICES_TEXT)
         else:
             # Print items in the specified category.
             for i, item in enumerate(self._menu.items_in_category(category)):
-                index = str(f"{i + 1}. ")
-                stock = str(f"{self._menu.stock_for_item(item)}x")
-
-                # Spaces from name to stock.
-                stock_spaces = " " * (50 - len(index) - len(item.name))
-                first_half = f"{index}{item.name}{stock_spaces}"
+                name = f"{i + 1}. {item.name}"
+                stock = f"{self._menu.stock_for_item(item)}x"
 
-                # Spaces from stock to price.
-                price_spaces = " " * (10 - len(stock) - len(item.price_text))
-                second_half = f"{stock}{price_spaces}{item.price_text}"
-
-                print(first_half + second_half)
+                # Pad the name to 50 characters, then right-align the price
+                # so the stock and price take up 10 characters.
+                price_width = 10 - len(stock)
+                print(f"{name:<50}{stock}{item.price_text:>{price_width}}")
 
     def ask_for_category(self) -> MenuCategory:
         """Ask the user for the menu category."""
@@ -347,11 +405,11 @@ class CafeProgram:
         self.print_menu_choices()
 
         # Ask the user for their choice.
-        count = len(MenuCategory)
+        count = len(_CATEGORIES)
         category_choice = get_valid_int("Enter a category: ", 1, count)
 
         # Determine the category by the user's choice.
-        category = MenuCategory(category_choice - 1)
+        category = _CATEGORIES[category_choice - 1]
 
         return category
 
@@ -373,67 +431,50 @@ class CafeProgram:
         first_name = get_valid_input("Enter first name: ")
         last_name = get_valid_input("Enter last name: ")
 
-        # Remove the items from stock.
-        for item_name in self._order.items.keys():
-            count = self._order.items[item_name]
-            item = self._menu.item_named(item_name)
-            self._menu.sell_item(item, count)
         print()
 
         # Reset the order for the next customer.
         print(f"Your order has been placed {first_name} {last_name}.")
         print(f"Please pay \
 {format_price(self._order.order_total, '$')} at lunch time.")
-        self._order = Order(self._menu)
+        self._order.clear()
 
         # Ask if the user should exit.
         if get_valid_bool("Press 'y' to exit, or 'n' to continue: "):
             self._is_running = False
 
 
-def read_menu() -> Menu:
+def read_menu() -> Menu | None:
     """
     Load the menu from a text file.
 
-    Return the dictionary if it can be parsed, or None otherwise.
+    Return the menu if it can be read, or None otherwise.
     """
-    menu_text: list[str] = []
-
     # Try safely opening the menu.txt file.
     try:
-        with open("menu.txt") as menu_file:
-            menu_text = menu_file.readlines()
+        with open("menu.txt", newline="") as menu_file:
+            # Read each non-empty row as a name, price and category.
+            rows = (row for row in csv.reader(menu_file) if row)
+
+            # Create objects from the rows.
+            menu_items = [
+                MenuItem(item_name,
+                         float(price_text),
+                         MenuCategory(int(category)))
+                for item_name, price_text, category in rows]
     except FileNotFoundError:
         print("No such file. Closing program.")
-
-    menu_items: list[MenuItem] = []
-
-    # Create objects from the dictionary.
-    for line in menu_text:
-        components = line.split(",")
-
-        # Convert the name.
-        item_name = components[0]
-
-        # Convert the price.
-        price_text = components[1]
-        price = float(price_text)
-
-        # Convert the category.
-        category_text = components[2]
-        category_number = int(category_text)
-        category = MenuCategory(category_number)
-
-        # Add the item to the list.
-        item = MenuItem(item_name, price, category)
-        menu_items.append(item)
+        return None
 
     return Menu(menu_items)
 
 
 if __name__ == "__main__":
     menu = read_menu()
-    order = Order(menu)
 
-    program = CafeProgram(menu, order)
-    program.run()
+    # Only run the program if the menu could be loaded.
+    if menu is not None:
+        order = Order(menu)
+
+        program = CafeProgram(menu, order)
+        program.run()
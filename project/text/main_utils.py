@@ -7,6 +7,8 @@ Created by Matua Doc.
 Created on 2023-06-11.
 """
 
+from functools import lru_cache
+
 
 def get_valid_input(prompt: str) -> str:
     """Continually ask for user input until a valid string is given."""
@@ -21,20 +23,17 @@ def get_valid_input(prompt: str) -> str:
 
 def get_valid_int(prompt: str, min: int, max: int) -> int:
     """Continually ask for user input until a valid int is given."""
-    user_int: int | None = None
-
-    # Loop until user_int is a valid number.
-    while not user_int:
+    # Loop until a valid number is given.
+    while True:
         try:
             user_int = int(get_valid_input(prompt))
-
-            # Reset user_int to None if the number is out of bounds.
-            if user_int < min or user_int > max:
-                user_int = None
         except ValueError:
             print("Please enter a valid number.")
+            continue
 
-    return user_int
+        # Only return the number if it is within bounds.
+        if min <= user_int <= max:
+            return user_int
 
 
 def get_valid_bool(prompt: str) -> bool:
@@ -55,6 +54,7 @@ def get_valid_bool(prompt: str) -> bool:
     return user_bool
 
 
+@lru_cache(maxsize=512)
 def format_price(price: float, symbol: str, prefix: bool = True) -> str:
     """
     Format a price float as text.
@@ -67,6 +67,9 @@ def format_price(price: float, symbol: str, prefix: bool = True) -> str:
     - prefix (bool): whether the symbol goes at the front (True)/end (False).
 
     Returns a formatted string containing the price.
+
+    Results are cached, as the same prices are formatted repeatedly.
     """
-    return f"{symbol if prefix else ''}{price:.2f}\
-{symbol if not prefix else ''}"
+    if prefix:
+        return f"{symbol}{price:.2f}"
+    return f"{price:.2f}{symbol}"
@@ -8,13 +8,12 @@ Created on 2023-06-11.
 """
 
 import tkinter as tk
-from tkinter import ttk, messagebox, simpledialog
+from tkinter import ttk, messagebox
 from typing import Callable
 
 from main_utils import format_price
-from main_utils import get_valid_bool, get_valid_input, get_valid_int
 from main_model import Menu, MenuItem, MenuCategory, Order
-from main_view_tkinter import CafeWindow
+from main_view_tkinter import CafeWindow, FinaliseOrderDialog
 
 
 class Row:
@@ -28,12 +27,13 @@ class Row:
                  remove_method: Callable[[MenuCategory], None]) -> None:
         """Connect the signal function for the buttons."""
         self.category = category
+        self.items = items
         self.frame = frame
 
         # Create widgets.
         self.combo_box = ttk.Combobox(
             self.frame,
-            values=[f"{item.name} ({format_price(item.price, '$')})"
+            values=[f"{item.name} ({item.price_text})"
                     for item
                     in items])
         self.combo_box.current(0)
@@ -59,11 +59,14 @@ class CafeProgram:
         self.menu = menu
         self.order = order
 
+        # Keep track of the order version shown in the order label.
+        self.shown_order_version = -1
+
         # Add the view.
         self.view = CafeWindow()
 
         # Keep track of the per-category widgets.
-        self.rows = []
+        self.rows: dict[MenuCategory, Row] = {}
 
         # Add items for each category.
         for category in MenuCategory:
@@ -78,11 +81,11 @@ class CafeProgram:
             # Add the items to a combo box.
             items = self.menu.items_in_category(category)
 
-            self.rows.append(Row(category,
-                                 items,
-                                 frame,
-                                 self.add_item_from_combobox,
-                                 self.remove_item_from_combobox))
+            self.rows[category] = Row(category,
+                                      items,
+                                      frame,
+                                      self.add_item_from_combobox,
+                                      self.remove_item_from_combobox)
 
         # Bind the finalise button.
         self.view.finalise_order_button.bind(
@@ -92,13 +95,16 @@ class CafeProgram:
 
     def update_ui(self) -> None:
         """Update the UI after an item is added/removed."""
-        self.view.order_label["text"] = str(self.order)
+        # Only set the label if the order has changed, to avoid a redraw.
+        if self.order.version != self.shown_order_version:
+            self.view.order_label["text"] = str(self.order)
+            self.shown_order_version = self.order.version
 
     def add_item_from_combobox(self, category: MenuCategory) -> None:
         """Add an item from a combo box to the order."""
         # Determine the current item based on the combo box's index.
-        index = self.rows[category.value].combo_box.current()
-        item = self.menu.items_in_category(category)[index]
+        row = self.rows[category]
+        item = row.items[row.combo_box.current()]
 
         # Try adding the item.
         try:
@@ -110,8 +116,8 @@ class CafeProgram:
     def remove_item_from_combobox(self, category: MenuCategory) -> None:
         """Remove an item the order based on the selection in the combo box."""
         # Determine the current item based on the combo box's index.
-        index = self.rows[category.value].combo_box.current()
-        item = self.menu.items_in_category(category)[index]
+        row = self.rows[category]
+        item = row.items[row.combo_box.current()]
 
         # Try adding the item.
         try:
@@ -122,39 +128,16 @@ class CafeProgram:
 
     def finalise_order_button_clicked(self, event: tk.Event) -> None:
         """Show the finalise order button window."""
-        first_name = None
-        last_name = None
-
-        # Check if the user cancels at any time.
-        user_did_cancel = False
-
-        # Ask for the first and last name until they are non-empty strings.
-        while not first_name:
-            # Get the first name.
-            first_name = simpledialog.askstring(
-                "Enter first name", "Please enter your first name.")
-            if first_name is None:
-                user_did_cancel = True
-                break
-
-        # Do the same as above for the last name. Don't ask for the last name
-        # if the user cancelled on the first name.
-        while not last_name and not user_did_cancel:
-            # Get the last name.
-            last_name = simpledialog.askstring(
-                "Enter last name", "Please enter your last name.")
-            if last_name is None:
-                user_did_cancel = True
-                break
-
-        # Calculate the order.
-        for item_name in self.order.items.keys():
-            count = self.order.items[item_name]
-            item = self.menu.item_named(item_name)
-            self.menu.sell_item(item, count)
-        messagebox.showinfo("Order complete",
-                            f"""Your order has been sent to the café.
+        # Ask for the first and last name in one dialog, which stays open
+        # until both are non-empty strings.
+        dialog = FinaliseOrderDialog(self.view)
+
+        # Only complete the order if the user didn't cancel.
+        if dialog.result is not None:
+            first_name, last_name = dialog.result
+            messagebox.showinfo("Order complete",
+                                f"""Your order has been sent to the café.
 Please pay {format_price(self.order.order_total, '$')} at lunch time.
 Quote the order for {first_name} {last_name}. Thank you!""")
-        self.order = Order(self.menu)
-        self.update_ui()
+            self.order.clear()
+            self.update_ui()
@@ -8,13 +8,18 @@ Created on 2023-06-11.
 """
 
 
-from dataclasses import dataclass
+import csv
+from dataclasses import dataclass, field
+from functools import lru_cache
 from enum import Enum
+import sys
 import tkinter as tk
 from tkinter import messagebox, simpledialog, ttk
+from types import MappingProxyType
 from typing import Callable
 
 
+@lru_cache(maxsize=512)
 def format_price(price: float, symbol: str, prefix: bool = True) -> str:
     """
     Format a price float as text.
@@ -27,9 +32,12 @@ def format_price(price: float, symbol: str, prefix: bool = True) -> str:
     - prefix (bool): whether the symbol goes at the front (True)/end (False).
 
     Returns a formatted string containing the price.
+
+    Results are cached, as the same prices are formatted repeatedly.
     """
-    return f"{symbol if prefix else ''}{price:.2f}\
-{symbol if not prefix else ''}"
+    if prefix:
+        return f"{symbol}{price:.2f}"
+    return f"{price:.2f}{symbol}"
 
 
 class MenuCategory(Enum):
@@ -42,53 +50,67 @@ class MenuCategory(Enum):
 
     def __str__(self) -> str:
         """Return the name of the category in human-readable form."""
-        match self:
-            case MenuCategory.FOOD: return "Food"
-            case MenuCategory.RICE: return "Rice meals"
-            case MenuCategory.DRINKS: return "Drinks"
+        return _CATEGORY_NAMES[self]
 
 
-@dataclass
-class MenuItem:
-    """An item on the menu."""
+# Human-readable names for each category.
+_CATEGORY_NAMES: dict[MenuCategory, str] = {
+    MenuCategory.FOOD: "Food",
+    MenuCategory.RICE: "Rice meals",
+    MenuCategory.DRINKS: "Drinks",
+}
 
-    _name: str
-    _price: float
-    _category: MenuCategory
 
-    @property
-    def name(self) -> str:
-        """The name of the item."""
-        return self._name
+@dataclass(frozen=True, slots=True, eq=False)
+class MenuItem:
+    """
+    An item on the menu.
 
-    @property
-    def price(self) -> float:
-        """The price of the item as a number."""
-        return self._price
+    Each item on the menu is a single object, so items are compared and
+    hashed by identity.
+    """
 
-    @property
-    def price_text(self) -> str:
-        """The price of the item as text."""
-        return format_price(self.price, "$")
+    # The name, price and category of the item.
+    name: str
+    price: float
+    category: MenuCategory
 
-    @property
-    def category(self) -> MenuCategory:
-        """The category of the item."""
-        return self._category
+    # The price of the item as text.
+    price_text: str = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        """Intern the name and format the price text once."""
+        # The item is frozen, so the fields have to be set through object.
+        object.__setattr__(self, "name", sys.intern(self.name))
+        object.__setattr__(self, "price_text", format_price(self.price, "$"))
 
 
-@dataclass
+@dataclass(slots=True)
 class Menu:
     """All items on the menu, including stock."""
 
     _items: list[MenuItem]
+    _stock: dict[str, int] = field(init=False, repr=False)
+    _items_by_name: dict[str, MenuItem] = field(init=False, repr=False)
+    _items_by_category: dict[MenuCategory, list[MenuItem]] = field(
+        init=False, repr=False)
 
     def __post_init__(self) -> None:
         """Create a stock dictionary based on the items passed in."""
-        self._stock: dict[str, int] = {}
+        self._stock = {}
         for item in self._items:
             self._stock[item.name] = 20
 
+        # Index the items by name for quick lookup.
+        self._items_by_name = {
+            item.name: item for item in self._items}
+
+        # Group the items by category, keeping their order from the menu.
+        self._items_by_category = {
+            category: [] for category in MenuCategory}
+        for item in self._items:
+            self._items_by_category[item.category].append(item)
+
     def item_named(self, name: str) -> MenuItem:
         """
         Return the item matching a given name.
@@ -98,34 +120,39 @@ class Menu:
 
         Raises an exception if no such item is found.
         """
-        # Search the list of items for one with a corresponding name.
-        for item in self._items:
-            if item.name == name:
-                return item
-
-        # If no item was found, raise an exception.
-        raise NameError(f"No such item '{name}'")
+        # Look up the item by its name, raising an exception if no item was
+        # found.
+        try:
+            return self._items_by_name[name]
+        except KeyError:
+            raise NameError(f"No such item '{name}'")
 
     def items_in_category(self, category: MenuCategory) -> list[MenuItem]:
         """All items in a given category."""
-        items = []
-
-        # Search the list of items for any with a matching category,
-        # then add it to the items list.
-        for item in self._items:
-            if item.category == category:
-                items.append(item)
-
-        return items
+        return self._items_by_category[category]
 
     def stock_for_item(self, item: MenuItem) -> int:
         """Return the amount in stock for a given item."""
         return self._stock[item.name]
 
-    def sell_item(self, item: MenuItem, count: int) -> None:
-        """Sell the given number of items."""
-        stock_count = self._stock[item.name]
-        self._stock[item.name] = stock_count - count
+    def reserve_item(self, item: MenuItem) -> int:
+        """
+        Take 1 of an item out of stock, returning the amount left.
+
+        Raises an exception if the item is out of stock.
+        """
+        stock = self._stock[item.name]
+        if stock == 0:
+            raise RuntimeError(f"No stock for {item.name}")
+
+        self._stock[item.name] = stock - 1
+        return stock - 1
+
+    def release_item(self, item: MenuItem) -> int:
+        """Put 1 of an item back into stock, returning the amount left."""
+        stock = self._stock[item.name] + 1
+        self._stock[item.name] = stock
+        return stock
 
 
 class Order:
@@ -134,44 +161,66 @@ class Order:
     # Constants.
     MAX_ITEM_COUNT = 2
 
+    __slots__ = ("_menu", "_items", "_items_view", "_order_total", "_text",
+                 "_version")
+
     def __init__(self, menu: Menu) -> None:
         """Create the order."""
         self._menu = menu
-        self._items: dict[str, int] = {}
+        self._items: dict[MenuItem, int] = {}
+
+        # Share a read-only view of the items with callers.
+        self._items_view = MappingProxyType(self._items)
+
+        # Keep a running total so it doesn't need to be recalculated.
+        self._order_total = 0.0
+
+        # Keep the pretty-printed order until the order changes.
+        self._text: str | None = None
+
+        # Count the changes made to the order.
+        self._version = 0
 
     def __str__(self) -> str:
         """Pretty-printed version of the current order."""
-        text = ""
+        if self._text is None:
+            # Add the items to each line.
+            lines = [f"{count}x {item.name}\n"
+                     for item, count in self._items.items()]
 
-        # Add the items to each line.
-        for item in self._items.keys():
-            count = self._items[item]
-            text = text + f"{count}x {item}\n"
+            # Show the order total price.
+            lines.append("\nTOTAL: " + format_price(self.order_total, "$"))
 
-        # Show the order total price.
-        text = text + "\n" + "TOTAL: " + format_price(self.order_total, "$")
+            self._text = "".join(lines)
 
-        return text
+        return self._text
 
     @property
-    def items(self) -> dict[str, int]:
-        """The items in the order."""
-        return self._items
+    def items(self) -> MappingProxyType[MenuItem, int]:
+        """The items in the order (read-only)."""
+        return self._items_view
+
+    @property
+    def version(self) -> int:
+        """The number of times the order has changed."""
+        return self._version
 
     @property
     def order_total(self) -> float:
         """The cost of the order so far."""
-        running_total = 0.0
+        return self._order_total
 
-        # Loop over every item in the list to find the corresponding price of
-        # the item in the menu, then multiply the purchase amount by that
-        # price to find the cost.
-        for item_name in self._items.keys():
-            item = self._menu.item_named(item_name)
-            count = self._items[item_name]
-            running_total = running_total + (item.price * count)
+    def clear(self) -> None:
+        """
+        Remove all items from the order, ready for the next customer.
 
-        return running_total
+        The items were taken out of stock as they were added, so they stay
+        sold.
+        """
+        self._items.clear()
+        self._order_total = 0.0
+        self._text = None
+        self._version = self._version + 1
 
     def add_item(self, item: MenuItem) -> None:
         """
@@ -179,24 +228,26 @@ class Order:
 
         Raises an exception if no more items can be added.
         """
-        # Check if the item is in stock. If not, raise an exception.
-        if self._menu.stock_for_item(item) == 0:
-            raise RuntimeError(f"No stock for {item.name}")
+        # Take the item out of stock so it can't be sold twice. This raises
+        # an exception if the item is out of stock.
+        self._menu.reserve_item(item)
+
+        # Otherwise, if the item is in stock, find how many are already in
+        # the order (0 if the item isn't in the order yet).
+        count = self._items.get(item, 0)
+
+        if count >= self.MAX_ITEM_COUNT:
+            # There are already the maximum allowed number of this item, so
+            # put the item back into stock.
+            self._menu.release_item(item)
+            raise RuntimeError(f"Cannot order more than \
+{self.MAX_ITEM_COUNT} of {item.name}")
 
-        # Otherwise, if the item is in stock…
-        if item.name in self._items.keys():
-            # The item already exists.
-            count = self._items[item.name]
+        self._items[item] = count + 1
 
-            if count == self.MAX_ITEM_COUNT:
-                # There are already the maximum allowed number of this item.
-                raise RuntimeError(f"Cannot order more than \
-{self.MAX_ITEM_COUNT} of {item.name}")
-            else:
-                self._items[item.name] = count + 1
-        else:
-            # The item was not already in the order. Add it now.
-            self._items[item.name] = 1
+        self._order_total = self._order_total + item.price
+        self._text = None
+        self._version = self._version + 1
 
     def remove_item(self, item: MenuItem) -> None:
         """
@@ -205,21 +256,41 @@ class Order:
         Raises an exception if the item is not in the order.
         """
         # Raise an exception if no such item exists.
-        if item.name not in self._items.keys():
+        count = self._items.get(item, 0)
+        if count == 0:
             raise RuntimeError(f"No such item {item.name} in order.")
+
+        if count > 1:
+            # If there are more than 1 of the item, reduce by 1.
+            self._items[item] = count - 1
         else:
-            count = self._items[item.name]
-            if count > 1:
-                # If there are more than 1 of the item, reduce by 1.
-                self._items[item.name] = count - 1
-            else:
-                # If there's only one, delete the key altogether.
-                del self._items[item.name]
+            # If there's only one, delete the key altogether.
+            del self._items[item]
+
+        # Put the item back into stock.
+        self._menu.release_item(item)
+
+        # Start again from 0 once the order is empty, so rounding errors in
+        # the running total don't leave it slightly below 0.
+        if self._items:
+            self._order_total = self._order_total - item.price
+        else:
+            self._order_total = 0.0
+        self._text = None
+        self._version = self._version + 1
 
 
 class CafeWindow(tk.Tk):
     """Main window for the café ordering system."""
 
+    # Constants.
+    WINDOW_WIDTH = 640
+    WINDOW_HEIGHT = 400
+
+    # The centred window geometry, worked out when the first window is
+    # created.
+    geometry_text: str | None = None
+
     def __init__(self) -> None:
         """Create the window layout."""
         super().__init__()
@@ -235,14 +306,48 @@ class CafeWindow(tk.Tk):
         self.finalise_order_button = tk.Button(self, text="Finalise order")
         self.finalise_order_button.pack(side=tk.BOTTOM)
 
-        # Detect the screen size and centre.
-        screen_width = self.winfo_screenwidth()
-        screen_height = self.winfo_screenheight()
-        window_width = 640
-        window_height = 400
-        center_x = int(screen_width / 2 - window_width / 2)
-        center_y = int(screen_height / 2 - window_height / 2)
-        self.geometry(f"{window_width}x{window_height}+{center_x}+{center_y}")
+        # Detect the screen size and centre (only once).
+        if CafeWindow.geometry_text is None:
+            center_x = (self.winfo_screenwidth() - self.WINDOW_WIDTH) // 2
+            center_y = (self.winfo_screenheight() - self.WINDOW_HEIGHT) // 2
+            CafeWindow.geometry_text = f"{self.WINDOW_WIDTH}x\
+{self.WINDOW_HEIGHT}+{center_x}+{center_y}"
+        self.geometry(CafeWindow.geometry_text)
+
+
+class FinaliseOrderDialog(simpledialog.Dialog):
+    """Dialog asking for the user's first and last name for the order."""
+
+    def __init__(self, parent: tk.Misc) -> None:
+        """Create the dialog and wait until it is closed."""
+        self.first_name = ""
+        self.last_name = ""
+        super().__init__(parent, "Finalise order")
+
+    def body(self, master: tk.Frame) -> tk.Entry:
+        """Add the name fields and return the one to focus first."""
+        tk.Label(master, text="First name:").grid(row=0, column=0, sticky="w")
+        tk.Label(master, text="Last name:").grid(row=1, column=0, sticky="w")
+        self.first_name_entry = tk.Entry(master)
+        self.first_name_entry.grid(row=0, column=1)
+        self.last_name_entry = tk.Entry(master)
+        self.last_name_entry.grid(row=1, column=1)
+        return self.first_name_entry
+
+    def validate(self) -> bool:
+        """Keep the dialog open until both names are non-empty."""
+        self.first_name = self.first_name_entry.get()
+        self.last_name = self.last_name_entry.get()
+        if not self.first_name or not self.last_name:
+            messagebox.showwarning("Finalise order",
+                                   "Please enter your first and last name.",
+                                   parent=self)
+            return False
+        return True
+
+    def apply(self) -> None:
+        """Store the names as the dialog's result."""
+        self.result = (self.first_name, self.last_name)
 
 
 class Row:
@@ -256,12 +361,13 @@ class Row:
                  remove_method: Callable[[MenuCategory], None]) -> None:
         """Connect the signal function for the buttons."""
         self.category = category
+        self.items = items
         self.frame = frame
 
         # Create widgets.
         self.combo_box = ttk.Combobox(
             self.frame,
-            values=[f"{item.name} ({format_price(item.price, '$')})"
+            values=[f"{item.name} ({item.price_text})"
                     for item
                     in items])
         self.combo_box.current(0)
@@ -287,11 +393,14 @@ class CafeProgram:
         self.menu = menu
         self.order = order
 
+        # Keep track of the order version shown in the order label.
+        self.shown_order_version = -1
+
         # Add the view.
         self.view = CafeWindow()
 
         # Keep track of the per-category widgets.
-        self.rows = []
+        self.rows: dict[MenuCategory, Row] = {}
 
         # Add items for each category.
         for category in MenuCategory:
@@ -306,11 +415,11 @@ class CafeProgram:
             # Add the items to a combo box.
             items = self.menu.items_in_category(category)
 
-            self.rows.append(Row(category,
-                                 items,
-                                 frame,
-                                 self.add_item_from_combobox,
-                                 self.remove_item_from_combobox))
+            self.rows[category] = Row(category,
+                                      items,
+                                      frame,
+                                      self.add_item_from_combobox,
+                                      self.remove_item_from_combobox)
 
         # Bind the finalise button.
         self.view.finalise_order_button.bind(
@@ -320,13 +429,16 @@ class CafeProgram:
 
     def update_ui(self) -> None:
         """Update the UI after an item is added/removed."""
-        self.view.order_label["text"] = str(self.order)
+        # Only set the label if the order has changed, to avoid a redraw.
+        if self.order.version != self.shown_order_version:
+            self.view.order_label["text"] = str(self.order)
+            self.shown_order_version = self.order.version
 
     def add_item_from_combobox(self, category: MenuCategory) -> None:
         """Add an item from a combo box to the order."""
         # Determine the current item based on the combo box's index.
-        index = self.rows[category.value].combo_box.current()
-        item = self.menu.items_in_category(category)[index]
+        row = self.rows[category]
+        item = row.items[row.combo_box.current()]
 
         # Try adding the item.
         try:
@@ -338,8 +450,8 @@ class CafeProgram:
     def remove_item_from_combobox(self, category: MenuCategory) -> None:
         """Remove an item the order based on the selection in the combo box."""
         # Determine the current item based on the combo box's index.
-        index = self.rows[category.value].combo_box.current()
-        item = self.menu.items_in_category(category)[index]
+        row = self.rows[category]
+        item = row.items[row.combo_box.current()]
 
         # Try adding the item.
         try:
@@ -350,82 +462,42 @@ class CafeProgram:
 
     def finalise_order_button_clicked(self, event: tk.Event) -> None:
         """Show the finalise order button window."""
-        first_name = None
-        last_name = None
-
-        # Check if the user cancels at any time.
-        user_did_cancel = False
-
-        # Ask for the first and last name until they are non-empty strings.
-        while not first_name:
-            # Get the first name.
-            first_name = simpledialog.askstring(
-                "Enter first name", "Please enter your first name.")
-            if first_name is None:
-                user_did_cancel = True
-                break
-
-        # Do the same as above for the last name. Don't ask for the last name
-        # if the user cancelled on the first name.
-        while not last_name and not user_did_cancel:
-            # Get the last name.
-            last_name = simpledialog.askstring(
-                "Enter last name", "Please enter your last name.")
-            if last_name is None:
-                user_did_cancel = True
-                break
-
-        # Only calculate the order if the user didn't cancel.
-        if not user_did_cancel:
-            # Calculate the order.
-            for item_name in self.order.items.keys():
-                count = self.order.items[item_name]
-                item = self.menu.item_named(item_name)
-                self.menu.sell_item(item, count)
+        # Ask for the first and last name in one dialog, which stays open
+        # until both are non-empty strings.
+        dialog = FinaliseOrderDialog(self.view)
+
+        # Only complete the order if the user didn't cancel.
+        if dialog.result is not None:
+            first_name, last_name = dialog.result
             messagebox.showinfo("Order complete",
                                 f"""Your order has been sent to the café.
     Please pay {format_price(self.order.order_total, '$')} at lunch time.
     Quote the order for {first_name} {last_name}. Thank you!""")
-            self.order = Order(self.menu)
+            self.order.clear()
             self.update_ui()
 
 
-def read_menu() -> Menu:
+def read_menu() -> Menu | None:
     """
     Load the menu from a text file.
 
-    Return the dictionary if it can be parsed, or None otherwise.
+    Return the menu if it can be read, or None otherwise.
     """
-    menu_text: list[str] = []
-
     # Try safely opening the menu.txt file.
     try:
-        with open("menu.txt") as menu_file:
-            menu_text = menu_file.readlines()
+        with open("menu.txt", newline="") as menu_file:
+            # Read each non-empty row as a name, price and category.
+            rows = (row for row in csv.reader(menu_file) if row)
+
+            # Create objects from the rows.
+            menu_items = [
+                MenuItem(item_name,
+                         float(price_text),
+                         MenuCategory(int(category)))
+                for item_name, price_text, category in rows]
     except FileNotFoundError:
         print("No such file. Closing program.")
-
-    menu_items: list[MenuItem] = []
-
-    # Create objects from the dictionary.
-    for line in menu_text:
-        components = line.split(",")
-
-        # Convert the name.
-        item_name = components[0]
-
-        # Convert the price.
-        price_text = components[1]
-        price = float(price_text)
-
-        # Convert the category.
-        category_text = components[2]
-        category_number = int(category_text)
-        category = MenuCategory(category_number)
-
-        # Add the item to the list.
-        item = MenuItem(item_name, price, category)
-        menu_items.append(item)
+        return None
 
     return Menu(menu_items)
 
@@ -433,5 +505,7 @@ def read_menu() -> Menu:
 if __name__ == "__main__":
     menu = read_menu()
 
-    order = Order(menu)
-    program = CafeProgram(menu, order)
+    # Only run the program if the menu could be loaded.
+    if menu is not None:
+        order = Order(menu)
+        program = CafeProgram(menu, order)
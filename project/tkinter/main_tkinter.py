@@ -7,46 +7,33 @@ Created by Matua Doc.
 Created on 2023-06-11.
 """
 
+import csv
+
 from main_model import Menu, MenuCategory, MenuItem, Order
 from main_controller_tkinter import CafeProgram
 
 
-def read_menu() -> Menu:
+def read_menu() -> Menu | None:
     """
-    Load the menu from a JSON file.
+    Load the menu from a text file.
 
-    Return the dictionary if it can be parsed, or None otherwise.
+    Return the menu if it can be read, or None otherwise.
     """
-    menu_text: list[str] = []
-
     # Try safely opening the menu.txt file.
     try:
-        with open("menu.txt") as menu_file:
-            menu_text = menu_file.readlines()
+        with open("menu.txt", newline="") as menu_file:
+            # Read each non-empty row as a name, price and category.
+            rows = (row for row in csv.reader(menu_file) if row)
+
+            # Create objects from the rows.
+            menu_items = [
+                MenuItem(item_name,
+                         float(price_text),
+                         MenuCategory(int(category)))
+                for item_name, price_text, category in rows]
     except FileNotFoundError:
         print("No such file. Closing program.")
-
-    menu_items: list[MenuItem] = []
-
-    # Create objects from the dictionary.
-    for line in menu_text:
-        components = line.split(",")
-
-        # Convert the name.
-        item_name = components[0]
-
-        # Convert the price.
-        price_text = components[1]
-        price = float(price_text)
-
-        # Convert the category.
-        category_text = components[2]
-        category_number = int(category_text)
-        category = MenuCategory(category_number)
-
-        # Add the item to the list.
-        item = MenuItem(item_name, price, category)
-        menu_items.append(item)
+        return None
 
     return Menu(menu_items)
 
@@ -54,5 +41,7 @@ def read_menu() -> Menu:
 if __name__ == "__main__":
     menu = read_menu()
 
-    order = Order(menu)
-    program = CafeProgram(menu, order)
+    # Only run the program if the menu could be loaded.
+    if menu is not None:
+        order = Order(menu)
+        program = CafeProgram(menu, order)
@@ -8,12 +8,20 @@ Created on 2023-06-11.
 """
 
 import tkinter as tk
-from tkinter import messagebox
+from tkinter import messagebox, simpledialog
 
 
 class CafeWindow(tk.Tk):
     """Main window for the café ordering system."""
 
+    # Constants.
+    WINDOW_WIDTH = 640
+    WINDOW_HEIGHT = 400
+
+    # The centred window geometry, worked out when the first window is
+    # created.
+    geometry_text: str | None = None
+
     def __init__(self) -> None:
         """Create the window layout."""
         super().__init__()
@@ -29,11 +37,45 @@ class CafeWindow(tk.Tk):
         self.finalise_order_button = tk.Button(self, text="Finalise order")
         self.finalise_order_button.pack(side=tk.BOTTOM)
 
-        # Detect the screen size and centre.
-        screen_width = self.winfo_screenwidth()
-        screen_height = self.winfo_screenheight()
-        window_width = 640
-        window_height = 400
-        center_x = int(screen_width / 2 - window_width / 2)
-        center_y = int(screen_height / 2 - window_height / 2)
-        self.geometry(f"{window_width}x{window_height}+{center_x}+{center_y}")
+        # Detect the screen size and centre (only once).
+        if CafeWindow.geometry_text is None:
+            center_x = (self.winfo_screenwidth() - self.WINDOW_WIDTH) // 2
+            center_y = (self.winfo_screenheight() - self.WINDOW_HEIGHT) // 2
+            CafeWindow.geometry_text = f"{self.WINDOW_WIDTH}x\
+{self.WINDOW_HEIGHT}+{center_x}+{center_y}"
+        self.geometry(CafeWindow.geometry_text)
+
+
+class FinaliseOrderDialog(simpledialog.Dialog):
+    """Dialog asking for the user's first and last name for the order."""
+
+    def __init__(self, parent: tk.Misc) -> None:
+        """Create the dialog and wait until it is closed."""
+        self.first_name = ""
+        self.last_name = ""
+        super().__init__(parent, "Finalise order")
+
+    def body(self, master: tk.Frame) -> tk.Entry:
+        """Add the name fields and return the one to focus first."""
+        tk.Label(master, text="First name:").grid(row=0, column=0, sticky="w")
+        tk.Label(master, text="Last name:").grid(row=1, column=0, sticky="w")
+        self.first_name_entry = tk.Entry(master)
+        self.first_name_entry.grid(row=0, column=1)
+        self.last_name_entry = tk.Entry(master)
+        self.last_name_entry.grid(row=1, column=1)
+        return self.first_name_entry
+
+    def validate(self) -> bool:
+        """Keep the dialog open until both names are non-empty."""
+        self.first_name = self.first_name_entry.get()
+        self.last_name = self.last_name_entry.get()
+        if not self.first_name or not self.last_name:
+            messagebox.showwarning("Finalise order",
+                                   "Please enter your first and last name.",
+                                   parent=self)
+            return False
+        return True
+
+    def apply(self) -> None:
+        """Store the names as the dialog's result."""
+        self.result = (self.first_name, self.last_name)